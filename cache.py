@@ -0,0 +1,113 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+CACHE_DIR = os.path.expanduser("~/.github_tool/cache")
+CACHE_TTL = 600       # seconds an entry is served without asking GitHub
+MEMORY_SIZE = 256     # entries kept in RAM for the current session
+DISK_MAX_BYTES = 100 * 1024 * 1024   # body size kept on disk before evicting
+DISK_EVICT_TO = 0.9   # evict down to this fraction of the budget so it isn't hit on every set
+
+
+def cache_key(api_url: str) -> str:
+    """Hash a request URL (query string included) into a cache key."""
+    return hashlib.sha256(api_url.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-level (RAM LRU + sqlite on disk) store of (etag, body) per URL."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, maxsize: int = MEMORY_SIZE, ttl: int = CACHE_TTL,
+                 max_disk_bytes: int = DISK_MAX_BYTES):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(cache_dir, "responses.sqlite"), check_same_thread=False)
+            # The first cache layout had no size/stored_at columns; it's only
+            # a cache, so drop it rather than migrate
+            self._db.execute("DROP TABLE IF EXISTS responses")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, etag TEXT, body TEXT, expires_at REAL, size INTEGER, stored_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)")
+            self._db.commit()
+            # Running total of body sizes, so eviction never has to scan bodies
+            self._disk_size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except (OSError, sqlite3.Error):
+            # No writable home directory: keep the in-memory layer only
+            self._db = None
+
+    def get(self, key: str):
+        """Return (etag, body, expires_at) for a key, or None if unknown."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT etag, body, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row)
+            return row
+
+    def set(self, key: str, etag, body: str):
+        """Store a response body and push its expiry CACHE_TTL into the future."""
+        now = time.time()
+        entry = (etag, body, now + self.ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                old = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, *entry, len(body), now)
+                )
+                self._disk_size += len(body) - (old[0] if old else 0)
+                if self._disk_size > self.max_disk_bytes:
+                    self._evict_disk()
+                self._db.commit()
+
+    def expire_all(self):
+        """Mark every entry stale; the ETags are kept so revalidation stays cheap."""
+        with self._lock:
+            for key, (etag, body, _) in self._memory.items():
+                self._memory[key] = (etag, body, 0)
+            if self._db is not None:
+                self._db.execute("UPDATE entries SET expires_at = 0")
+                self._db.commit()
+
+    def _evict_disk(self):
+        # Drop the least recently stored entries until comfortably under budget
+        target = self.max_disk_bytes * DISK_EVICT_TO
+        while self._disk_size > target:
+            oldest = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY stored_at LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                self._disk_size = 0
+                break
+            evicted = []
+            for key, size in oldest:
+                evicted.append((key,))
+                self._disk_size -= size
+                if self._disk_size <= target:
+                    break
+            self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
@@ -1,34 +1,79 @@
 from langgraph.graph import StateGraph
-from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import inspect
 import json
+import operator
+import os
+import sys
+from typing import Annotated, TypedDict
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to compact stdlib json
+    orjson = None
 from tools import (
+    get_repo_overview,
     get_repo_info,
     get_repo_languages,
     get_repo_commits,
     get_repo_branches,
     get_repo_contributors,
     list_repo_files,
-    get_file_content
+    get_file_content,
+    get_files_content,
+    refresh_repo_data
 )
 
-class State(BaseModel):
-    messages: list
+# Set GITHUB_DEBUG=1 to print graph diagnostics (node banners, tool
+# execution, the message history on every agent step) to stderr
+DEBUG = bool(os.getenv("GITHUB_DEBUG"))
+
+
+def debug(*args):
+    """Print a diagnostic line to stderr, only when DEBUG is on"""
+    if DEBUG:
+        print(*args, file=sys.stderr)
+
+
+# A TypedDict state is passed through as-is; a pydantic model would
+# re-validate the whole (growing) message list on every node hop.
+# The operator.add reducer lets nodes return only their new messages.
+class State(TypedDict):
+    messages: Annotated[list, operator.add]
 
 # Initialize the LLM with tools bound
-llm = ChatOpenAI(model="gpt-4o-mini").bind_tools([
+llm = ChatOpenAI(model="gpt-4o-mini", streaming=True).bind_tools([
+    get_repo_overview,
     get_repo_info,
     get_repo_languages,
     get_repo_commits,
     get_repo_branches,
     get_repo_contributors,
     list_repo_files,
-    get_file_content
+    get_file_content,
+    get_files_content,
+    refresh_repo_data
 ])
 
+# Plain model (no tools) used to compress old conversation history
+summarizer = ChatOpenAI(model="gpt-4o-mini")
+
+# Once the history passes HISTORY_CHAR_LIMIT characters (a cheap token
+# proxy), everything but the first prompt and roughly the last
+# HISTORY_KEEP messages is replaced by a summary
+HISTORY_CHAR_LIMIT = 60_000
+HISTORY_KEEP = 12
+# Each dropped message is clipped to this many characters before it goes to
+# the summarizer (file reads alone can be 256 KB), and the whole transcript
+# is capped well inside the summarizer's context window
+SUMMARY_MESSAGE_CHARS = 2_000
+SUMMARY_TRANSCRIPT_CHARS = 200_000
+
 # Map tool names to functions
 TOOLS = {
+    "get_repo_overview": get_repo_overview,
     "get_repo_info": get_repo_info,
     "get_repo_languages": get_repo_languages,
     "get_repo_commits": get_repo_commits,
@@ -36,96 +81,135 @@ TOOLS = {
     "get_repo_contributors": get_repo_contributors,
     "list_repo_files": list_repo_files,
     "get_file_content": get_file_content,
+    "get_files_content": get_files_content,
+    "refresh_repo_data": refresh_repo_data,
 }
 
-def execute_tools(state: State):
-    """Manually execute tools and preserve message history"""
-    print(f"\nTOOL EXECUTION - Processing {len(state.messages)} messages")
+def dump_result(result):
+    """Serialize a tool result as compact JSON for the LLM"""
+    if orjson is not None:
+        return orjson.dumps(result).decode()
+    return json.dumps(result, separators=(",", ":"))
+
+
+# Plain functions behind each tool: OpenAI already enforces the argument
+# schema, so the hot path skips StructuredTool's pydantic validation
+_FAST_TOOLS = {name: getattr(tool, "func", tool) for name, tool in TOOLS.items()}
+_FAST_SIGNATURES = {name: inspect.signature(func) for name, func in _FAST_TOOLS.items()}
+
+
+# Dedicated, bounded pool for tool fan-out; tool calls are blocking HTTP I/O
+_POOL = ThreadPoolExecutor(max_workers=8)
+
+
+def _invoke_tool(tool_call):
+    """Run a single tool call (blocking) and return its result as ToolMessage content"""
+    tool_name = tool_call["name"]
+    tool_args = tool_call["args"]
+    try:
+        _FAST_SIGNATURES[tool_name].bind(**tool_args)
+    except TypeError:
+        # Arguments don't fit the raw signature - let .invoke() validate/coerce them
+        result = TOOLS[tool_name].invoke(tool_args)
+    else:
+        result = _FAST_TOOLS[tool_name](**tool_args)
+    
+    # Serialize here so an encoding error becomes this call's error message
+    # Compact JSON: indentation only adds prompt tokens for the LLM
+    if isinstance(result, (dict, list)):
+        return dump_result(result)
+    return str(result)
+
+
+async def execute_tools(state: State):
+    """Execute tool calls concurrently and preserve message history"""
+    debug(f"\nTOOL EXECUTION - Processing {len(state['messages'])} messages")
     
     # Get the last AI message with tool calls
-    last_message = state.messages[-1]
+    last_message = state["messages"][-1]
     
     if not hasattr(last_message, 'tool_calls') or not last_message.tool_calls:
-        print("No tool calls found in last message")
-        return state
+        debug("No tool calls found in last message")
+        return {"messages": []}
+    
+    tool_calls = last_message.tool_calls
+    for tool_call in tool_calls:
+        debug(f"  Executing: {tool_call['name']}({list(tool_call['args'].keys())})")
+    
+    # Every tool is independent blocking HTTP I/O, so run them all at once
+    # on the tool pool; gather keeps results in the original call order
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(_POOL, _invoke_tool, tool_call) for tool_call in tool_calls),
+        return_exceptions=True
+    )
     
-    # Execute each tool call
     tool_results = []
-    for tool_call in last_message.tool_calls:
+    for tool_call, result in zip(tool_calls, results):
         tool_name = tool_call["name"]
-        tool_args = tool_call["args"]
         tool_id = tool_call["id"]
         
-        print(f"  Executing: {tool_name}({list(tool_args.keys())})")
-        
-        try:
-            # Get the tool function
-            tool_func = TOOLS[tool_name]
-            
-            # Call using .invoke() for StructuredTool objects
-            result = tool_func.invoke(tool_args)
-            
-            # Convert result to JSON string for better readability
-            if isinstance(result, (dict, list)):
-                content = json.dumps(result, indent=2)
-            else:
-                content = str(result)
-            
-            # Create a ToolMessage for this result
-            tool_message = ToolMessage(
-                content=content,
-                tool_call_id=tool_id,
-                name=tool_name
-            )
-            tool_results.append(tool_message)
-            print(f"    ✓ Success - returned {len(content)} chars")
-        except Exception as e:
-            print(f"    ✗ Error: {str(e)}")
+        if isinstance(result, Exception):
+            debug(f"    ✗ {tool_name} error: {str(result)}")
             tool_message = ToolMessage(
-                content=f"Error executing {tool_name}: {str(e)}",
+                content=f"Error executing {tool_name}: {str(result)}",
                 tool_call_id=tool_id,
                 name=tool_name
             )
             tool_results.append(tool_message)
+            continue
+        
+        # Create a ToolMessage for this result (already serialized by _invoke_tool)
+        tool_message = ToolMessage(
+            content=result,
+            tool_call_id=tool_id,
+            name=tool_name
+        )
+        tool_results.append(tool_message)
+        debug(f"    ✓ {tool_name} - returned {len(result)} chars")
     
-    # IMPORTANT: Append tool messages to preserve history
-    new_messages = state.messages + tool_results
-    
-    print(f"Tool execution complete. Total messages now: {len(new_messages)}")
+    debug(f"Tool execution complete. Appending {len(tool_results)} tool messages")
     
-    return {"messages": new_messages}
+    # Only the new messages: the reducer appends them to the history
+    return {"messages": tool_results}
 
-def agent_node(state: State):
+async def agent_node(state: State):
     """Call the LLM with accumulated messages"""
-    print(f"\n{'='*60}")
-    print(f"AGENT NODE - Current messages: {len(state.messages)}")
-    for i, msg in enumerate(state.messages):
-        msg_type = type(msg).__name__
-        has_calls = hasattr(msg, 'tool_calls') and bool(msg.tool_calls)
-        print(f"  [{i}] {msg_type} (tool_calls: {has_calls})")
-    print(f"{'='*60}")
+    debug(f"\n{'='*60}")
+    debug(f"AGENT NODE - Current messages: {len(state['messages'])}")
+    if DEBUG:
+        for i, msg in enumerate(state["messages"]):
+            msg_type = type(msg).__name__
+            has_calls = hasattr(msg, 'tool_calls') and bool(msg.tool_calls)
+            debug(f"  [{i}] {msg_type} (tool_calls: {has_calls})")
+    debug(f"{'='*60}")
     
     # Invoke LLM with full message history
-    ai_msg = llm.invoke(state.messages)
-    print(f"AI Message created with {len(ai_msg.tool_calls) if hasattr(ai_msg, 'tool_calls') else 0} tool calls")
+    ai_msg = await llm.ainvoke(state["messages"])
+    debug(f"AI Message created with {len(ai_msg.tool_calls) if hasattr(ai_msg, 'tool_calls') else 0} tool calls")
     
-    # Return updated state - append AI message
-    new_messages = state.messages + [ai_msg]
-    print(f"Returning {len(new_messages)} total messages")
-    return {"messages": new_messages}
+    # Return only the new AI message - the reducer appends it
+    return {"messages": [ai_msg]}
 
 def tool_condition(state: State):
     """Determine if we should call tools or end"""
-    last = state.messages[-1]
+    last = state["messages"][-1]
     
     # Check if the last message is an AI message with tool calls
     if hasattr(last, "tool_calls") and last.tool_calls:
-        print(f"Tool condition: routing to tools ({len(last.tool_calls)} calls)")
+        debug(f"Tool condition: routing to tools ({len(last.tool_calls)} calls)")
         return "tools"
     
-    print("Tool condition: routing to end")
+    debug("Tool condition: routing to end")
     return "end"
 
+def entry_condition(state: State):
+    """Start at the tools node when the history already ends in pending tool calls"""
+    last = state["messages"][-1]
+    if hasattr(last, "tool_calls") and last.tool_calls:
+        return "tools"
+    return "agent"
+
 # Build the graph
 graph = StateGraph(State)
 
@@ -133,8 +217,15 @@ graph = StateGraph(State)
 graph.add_node("agent", agent_node)
 graph.add_node("tools", execute_tools)
 
-# Set entry point
-graph.set_entry_point("agent")
+# Set entry point - the interactive loop may hand over an AI message
+# whose tool calls have not been executed yet
+graph.set_conditional_entry_point(
+    entry_condition,
+    {
+        "tools": "tools",
+        "agent": "agent"
+    }
+)
 
 # Add conditional edges from agent
 graph.add_conditional_edges(
@@ -153,46 +244,135 @@ graph.add_edge("tools", "agent")
 app = graph.compile()
 
 
+async def prune_history(messages):
+    """Summarize older turns so the prompt stays bounded across a long session"""
+    if sum(len(str(msg.content)) for msg in messages) <= HISTORY_CHAR_LIMIT:
+        return messages
+    
+    # Cut on a HumanMessage boundary so no kept ToolMessage loses the
+    # AIMessage whose tool_call_id it answers
+    start = len(messages) - HISTORY_KEEP
+    while start > 1 and not isinstance(messages[start], HumanMessage):
+        start -= 1
+    if start <= 1:
+        return messages
+    
+    old = messages[1:start]
+    transcript = "\n\n".join(
+        f"{type(msg).__name__}: {str(msg.content)[:SUMMARY_MESSAGE_CHARS]}" for msg in old
+    )
+    # Keep the most recent part if the clipped transcript is still too long
+    transcript = transcript[-SUMMARY_TRANSCRIPT_CHARS:]
+    try:
+        summary = await summarizer.ainvoke([
+            SystemMessage(content="Summarize the prior conversation for context. Keep repository facts, file names and conclusions."),
+            HumanMessage(content=transcript)
+        ])
+    except Exception as e:
+        # A failed summary must not end the session: drop the old turns instead
+        print(f"History summary failed ({e}); dropping {len(old)} older messages")
+        summary_msg = SystemMessage(content="Earlier conversation was omitted to save space.")
+        return [messages[0], summary_msg, *messages[start:]]
+    print(f"History pruned: {len(old)} messages summarized")
+    
+    summary_msg = SystemMessage(content=f"Summary of the earlier conversation:\n{summary.content}")
+    return [messages[0], summary_msg, *messages[start:]]
+
+
 def get_final_ai_response(response):
     """Extract the final AI message that contains the summary"""
     for msg in reversed(response["messages"]):
-        if type(msg).__name__ == "AIMessage" and hasattr(msg, 'content'):
+        if isinstance(msg, AIMessage) and msg.content:
             return msg.content
     return "(No AI response found)"
 
 
-def run_analysis(repo_url):
-    """Run initial repository analysis"""
-    response = app.invoke({
-        "messages": [
-            HumanMessage(
-                content=f"""
-                Analyze {repo_url} and give me a comprehensive summary. 
-                
-                Make sure to:
-                1. Get basic repository information
-                2. Check the programming languages used
-                3. Review recent commits
-                4. Look at the branches
-                5. See who the main contributors are
-                6. Browse the repository structure and list files
-                
-                After listing files, I will ask you to analyze specific files.
-                """
-            )
-        ]
-    })
+async def stream_agent(messages, prefix=""):
+    """Run the graph, printing AI tokens as they arrive, and return the final state"""
+    final_state = None
+    streamed = False
+    async for event in app.astream_events({"messages": messages}, version="v2"):
+        if event["event"] == "on_chat_model_stream":
+            token = event["data"]["chunk"].content
+            if token:
+                if not streamed:
+                    print(f"\n{prefix}", end="")
+                    streamed = True
+                print(token, end="", flush=True)
+        elif event["event"] == "on_chain_end" and not event["parent_ids"]:
+            # The root run ending carries the final graph state
+            final_state = event["data"]["output"]
+    
+    if not streamed:
+        print(f"\n{prefix}{get_final_ai_response(final_state)}", end="")
+    print("\n")
+    return final_state
+
+
+async def stream_llm(messages, prefix=""):
+    """Call the LLM directly (no graph), printing tokens as they arrive; None if nothing came back"""
+    ai_msg = None
+    streamed = False
+    async for chunk in llm.astream(messages):
+        ai_msg = chunk if ai_msg is None else ai_msg + chunk
+        if chunk.content:
+            if not streamed:
+                print(f"\n{prefix}", end="")
+                streamed = True
+            print(chunk.content, end="", flush=True)
     
+    if streamed:
+        print("\n")
+    return ai_msg
+
+
+# The initial analysis always needs the overview, so it is fetched up
+# front instead of waiting for the LLM to plan the call: (tool_call_id, tool, extra args)
+PRELOAD_CALLS = [
+    ("preload-overview", "get_repo_overview", {}),
+]
+
+
+async def preload_analysis(repo_url):
+    """Fetch the initial analysis data as a synthetic tool-call round"""
+    ai_msg = AIMessage(content="", tool_calls=[
+        {"name": name, "args": {"url": repo_url, **args}, "id": call_id, "type": "tool_call"}
+        for call_id, name, args in PRELOAD_CALLS
+    ])
+    tool_results = await execute_tools({"messages": [ai_msg]})
+    return [ai_msg, *tool_results["messages"]]
+
+
+async def run_analysis(repo_url):
+    """Run initial repository analysis"""
     print("\n" + "="*80)
     print("=== INITIAL REPOSITORY ANALYSIS ===")
     print("="*80)
-    final_summary = get_final_ai_response(response)
-    print(final_summary)
+    
+    # Seed the history with the already-executed tool call so the LLM's
+    # first step is the summary rather than planning which tools to call
+    preloaded = await preload_analysis(repo_url)
+    
+    response = await stream_agent([
+        HumanMessage(
+            content=f"""
+            Analyze {repo_url} and give me a comprehensive summary. 
+            
+            The repository overview below has already been fetched: basic
+            repository information, languages, recent commits, branches,
+            main contributors and the top-level file structure. Summarize it
+            without calling any tools.
+            
+            Afterwards I will ask you to analyze specific files.
+            """
+        ),
+        *preloaded
+    ])
     
     return response
 
 
-def interactive_file_explorer(initial_response, repo_url):
+async def interactive_file_explorer(initial_response, repo_url):
     """Interactive chatbot to explore specific files"""
     messages = initial_response["messages"].copy()
     
@@ -220,19 +400,25 @@ def interactive_file_explorer(initial_response, repo_url):
         # Add user message to conversation
         messages.append(HumanMessage(content=user_input))
         
-        # Run the agent with the updated message history
-        response = app.invoke({"messages": messages})
-        
-        # Get the final AI response
-        final_response = get_final_ai_response(response)
-        
-        print(f"\nAssistant: {final_response}\n")
+        # Fast path: ask the LLM directly and only enter the graph when it
+        # wants tools, so follow-ups answered from context skip graph dispatch
+        ai_msg = await stream_llm(messages, prefix="Assistant: ")
+        if ai_msg is None:
+            print("\nAssistant: (No AI response received)\n")
+            messages.pop()
+            continue
+        messages.append(ai_msg)
+        if ai_msg.tool_calls:
+            # Don't repeat the prefix if part of the answer was already streamed
+            prefix = "" if ai_msg.content else "Assistant: "
+            response = await stream_agent(messages, prefix=prefix)
+            messages = response["messages"]
         
-        # Update messages for next iteration
-        messages = response["messages"]
+        # Keep the prompt bounded for the next iteration
+        messages = await prune_history(messages)
 
 
-if __name__ == "__main__":
+async def main():
     print("="*80)
     print("INTERACTIVE GITHUB REPOSITORY ANALYZER")
     print("="*80)
@@ -245,7 +431,13 @@ if __name__ == "__main__":
         print(f"Using default repository: {repo_url}")
     
     # Run initial analysis
-    initial_response = run_analysis(repo_url)
+    initial_response = await run_analysis(repo_url)
     
     # Start interactive file explorer
-    interactive_file_explorer(initial_response, repo_url)
\ No newline at end of file
+    await interactive_file_explorer(initial_response, repo_url)
+
+
+if __name__ == "__main__":
+    # A single event loop for the whole session keeps the LLM's async
+    # HTTP client bound to one loop
+    asyncio.run(main())
@@ -1,9 +1,17 @@
-import re
 from langchain_core.tools import tool
 from dotenv import load_dotenv
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import atexit
 import base64
+import json
+import threading
+import time
 import os
+import httpx
+from cache import ResponseCache, cache_key
+from url_parser import url_parser
 
 load_dotenv()
 
@@ -13,42 +21,347 @@ HEADERS = {
     "Accept": "application/vnd.github+json"
 }
 
+# One HTTP/2 client shared by every tool: repeated calls reuse the
+# connection, and concurrent calls from the tool threads are multiplexed
+# as streams over one TLS connection per host instead of a socket each
+CLIENT = httpx.Client(
+    headers=HEADERS,
+    timeout=30.0,
+    follow_redirects=True,
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=3,    # connection failures only; 5xx is retried in github_request
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+)
+atexit.register(CLIENT.close)
+
+
+# GitHub's secondary rate limit punishes bursts of concurrent requests,
+# so at most GITHUB_CONCURRENCY calls are in flight across all tool threads
+GITHUB_CONCURRENCY = 10
+_GITHUB_SLOTS = threading.BoundedSemaphore(GITHUB_CONCURRENCY)
+RATE_LIMIT_FLOOR = 10        # start spacing out calls when fewer requests than this remain
+MAX_RATE_LIMIT_WAIT = 60     # never block a single call longer than this (seconds)
+MAX_RATE_LIMIT_RETRIES = 3
+RETRY_STATUSES = (502, 503, 504)
+
+
+def _retry_after_seconds(value: str):
+    """Parse Retry-After, which is either delta-seconds or an HTTP date."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def _rate_limit_delay(response, attempt: int):
+    """Seconds to wait before retrying a rate-limited response, or None if retrying is pointless."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        delay = _retry_after_seconds(retry_after)
+        if delay is None:
+            return min(2 ** attempt, 30)
+        return max(delay, 0) if delay <= MAX_RATE_LIMIT_WAIT else None
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        # Primary quota exhausted: only worth waiting if it resets soon
+        reset = float(response.headers.get("X-RateLimit-Reset", 0))
+        delay = max(reset - time.time(), 1)
+        return delay if delay <= MAX_RATE_LIMIT_WAIT else None
+    return min(2 ** attempt, 30)
+
+
+class RateLimitExceeded(httpx.HTTPError):
+    """GitHub's rate limit won't lift within MAX_RATE_LIMIT_WAIT."""
+
+
+# Earliest time any thread may send its next request, derived from the
+# rate-limit headers of every response
+_resume_at = 0.0
+_resume_lock = threading.Lock()
+
+
+def _pause_until(timestamp: float):
+    global _resume_at
+    with _resume_lock:
+        _resume_at = max(_resume_at, timestamp)
+
+
+def _wait_for_quota():
+    """Block until requests may resume; fail fast if that is too far away."""
+    with _resume_lock:
+        delay = _resume_at - time.time()
+    if delay > MAX_RATE_LIMIT_WAIT:
+        raise RateLimitExceeded(f"GitHub rate limit reached; requests resume in {int(delay)}s")
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _note_rate_limit(response):
+    """Move the shared resume time according to a response's rate-limit headers."""
+    if _is_rate_limited(response) and "Retry-After" in response.headers:
+        delay = _retry_after_seconds(response.headers["Retry-After"])
+        if delay is not None:
+            _pause_until(time.time() + delay)
+
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+    remaining, reset = int(remaining), float(reset)
+    if remaining == 0:
+        _pause_until(reset)
+    elif remaining < RATE_LIMIT_FLOOR:
+        # Spread the last few requests over the time left until the reset
+        spacing = (reset - time.time()) / remaining
+        _pause_until(time.time() + min(max(spacing, 0), MAX_RATE_LIMIT_WAIT))
+
+
+def _is_rate_limited(response) -> bool:
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers
+        or response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+def github_request(url: str, headers=None, stream: bool = False):
+    """GET through the shared client, throttled and retried per GitHub's rate limits.
+
+    With ``stream=True`` the body is not read yet; the caller must close the response.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        # Pace before sending: once a response is in hand its quota is already spent
+        _wait_for_quota()
+        with _GITHUB_SLOTS:
+            response = CLIENT.send(CLIENT.build_request("GET", url, headers=headers), stream=stream)
+        _note_rate_limit(response)
+        if response.status_code in RETRY_STATUSES:
+            delay = 0.3 * 2 ** attempt
+        elif _is_rate_limited(response):
+            delay = _rate_limit_delay(response, attempt)
+        else:
+            break
+        if delay is None or attempt == MAX_RATE_LIMIT_RETRIES:
+            # Out of attempts, or the limit won't lift within MAX_RATE_LIMIT_WAIT
+            break
+        response.close()
+        time.sleep(delay)
+
+    return response
+
+
+# Responses are cached per URL; stale entries are revalidated with the
+# stored ETag so unchanged resources come back as a bodyless 304
+CACHE = ResponseCache()
+
+
+def github_get(api_url: str):
+    """GET a GitHub API URL as JSON, served from cache when possible."""
+    key = cache_key(api_url)
+    cached = CACHE.get(key)
+    if cached is not None and cached[2] > time.time():
+        return json.loads(cached[1])
+
+    headers = {"If-None-Match": cached[0]} if cached is not None and cached[0] else {}
+    response = github_request(api_url, headers=headers)
+
+    if response.status_code == 304 and cached is not None:
+        CACHE.set(key, cached[0], cached[1])
+        return json.loads(cached[1])
+
+    # Raise rather than return error payloads: exceptions are never cached
+    # (here or by the lru_cache layers) and surface as error ToolMessages
+    if not response.is_success:
+        try:
+            message = response.json().get("message", "")
+        except ValueError:
+            message = response.text[:200]
+        raise httpx.HTTPStatusError(
+            f"GitHub returned {response.status_code} for {api_url}: {message}",
+            request=response.request,
+            response=response
+        )
+
+    CACHE.set(key, response.headers.get("ETag"), response.text)
+    return response.json()
+
+
+# Files larger than this are cut off; the rest would only blow the prompt budget
+MAX_FILE_BYTES = 256 * 1024
+
+
+BINARY_CONTENT_TYPES = ("image/", "audio/", "video/", "application/octet-stream")
+
+
+def is_binary(data: bytes, content_type: str = "") -> bool:
+    """Cheap sniff: binary MIME type, a NUL byte, or mostly control characters."""
+    if content_type.startswith(BINARY_CONTENT_TYPES):
+        return True
+    if b"\x00" in data[:8192]:
+        return True
+    sample = data[:4096]
+    if not sample:
+        return False
+    control = sum(b < 9 or 13 < b < 32 for b in sample)
+    return control / len(sample) > 0.30
+
+
+def binary_placeholder(file_path: str, size=None) -> dict:
+    description = f"{size} bytes" if size is not None else "size unknown"
+    return {"file_path": file_path, "content": f"<binary file, {description}>"}
+
+
+def read_raw_file(raw_url: str, file_path: str, size=None):
+    """Stream a file from the raw host, capped at MAX_FILE_BYTES; None on 404.
+
+    ``size`` is the file's real size when the caller already knows it (e.g.
+    from a tree listing); it is only used to describe skipped binaries.
+    """
+    response = github_request(raw_url, stream=True)
+    try:
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+
+        # Don't download binaries just to throw them away
+        if is_binary(b"", response.headers.get("Content-Type", "")):
+            # Content-Length is the compressed size under gzip and absent
+            # when chunked, so only trust it for an unencoded body
+            length = response.headers.get("Content-Length")
+            if size is None and length is not None and "Content-Encoding" not in response.headers:
+                size = int(length)
+            return binary_placeholder(file_path, size)
+
+        chunks, read = [], 0
+        for chunk in response.iter_bytes(chunk_size=65536):
+            chunks.append(chunk)
+            read += len(chunk)
+            if read > MAX_FILE_BYTES:
+                break
+    finally:
+        response.close()
+
+    data = b"".join(chunks)
+    if is_binary(data):
+        if size is None and len(data) <= MAX_FILE_BYTES:
+            size = len(data)
+        return binary_placeholder(file_path, size)
+
+    result = {
+        "file_path": file_path,
+        "content": data[:MAX_FILE_BYTES].decode("utf-8", errors="ignore")
+    }
+    if len(data) > MAX_FILE_BYTES:
+        result["truncated"] = True
+    return result
+
 
 # -------------------------
-# YOUR CUSTOM URL PARSER
+# RESPONSE TRIMMING
 # -------------------------
-def url_parser(url: str) -> tuple[str, str]:
-    """Parse a GitHub repo URL and return (owner, repo)."""
-    url = url.rstrip("/")            # remove trailing slash
-    url = url.replace(".git", "")    # remove .git suffix
-    parts = url.split("/")           # split by /
-    owner = parts[-2]
-    repo = parts[-1]
-    return owner, repo
+# Raw GitHub payloads are mostly URL fields and nested user objects the
+# LLM never needs; keep only what is useful to reason about the repo.
+# Payloads of an unexpected shape are passed through untouched.
+
+def trim_repo_info(data: dict) -> dict:
+    if "name" not in data:
+        return data
+    return {
+        "name": data["name"],
+        "description": data.get("description"),
+        "stars": data.get("stargazers_count"),
+        "forks": data.get("forks_count"),
+        "language": data.get("language"),
+        "default_branch": data.get("default_branch"),
+        "license": (data.get("license") or {}).get("spdx_id"),
+        "topics": data.get("topics", []),
+        "updated_at": data.get("updated_at"),
+    }
 
 
-# OPTIONAL: alias to keep compatibility
-parse_github_url = url_parser
+def trim_commits(data: list) -> list:
+    if not isinstance(data, list):
+        return data
+    return [
+        {
+            "sha": c["sha"][:7],
+            "message": (c["commit"]["message"].splitlines() or [""])[0],
+            "author": (c.get("author") or {}).get("login") or c["commit"]["author"]["name"],
+            "date": c["commit"]["author"]["date"],
+        }
+        for c in data
+    ]
+
+
+def trim_branches(data: list) -> list:
+    if not isinstance(data, list):
+        return data
+    return [b["name"] for b in data]
+
+
+def trim_contributors(data: list) -> list:
+    if not isinstance(data, list):
+        return data
+    return [{"login": c["login"], "contributions": c["contributions"]} for c in data[:20]]
+
+
+def trim_files(data):
+    if not isinstance(data, list):
+        return data
+    return [{"name": f["name"], "type": f["type"], "size": f["size"]} for f in data]
 
 
 # -------------------------
 # TOOLS
 # -------------------------
 
+# Repo metadata rarely changes within a session, so these lookups are
+# memoized per (owner, repo[, path]); refresh_repo_data clears them
+
+@lru_cache(maxsize=64)
+def _repo_info(owner: str, repo: str) -> dict:
+    return trim_repo_info(github_get(f"https://api.github.com/repos/{owner}/{repo}"))
+
+
+@lru_cache(maxsize=64)
+def _repo_languages(owner: str, repo: str) -> dict:
+    return github_get(f"https://api.github.com/repos/{owner}/{repo}/languages")
+
+
+@lru_cache(maxsize=64)
+def _repo_branches(owner: str, repo: str) -> list:
+    return trim_branches(github_get(f"https://api.github.com/repos/{owner}/{repo}/branches"))
+
+
+@lru_cache(maxsize=64)
+def _repo_contributors(owner: str, repo: str) -> list:
+    return trim_contributors(github_get(f"https://api.github.com/repos/{owner}/{repo}/contributors"))
+
+
+@lru_cache(maxsize=256)
+def _repo_files(owner: str, repo: str, path: str):
+    return trim_files(github_get(f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"))
+
+
+SESSION_CACHES = (_repo_info, _repo_languages, _repo_branches, _repo_contributors, _repo_files)
+
+
 @tool
 def get_repo_info(url: str) -> dict:
     """Get basic info about a GitHub repository."""
-    owner, repo = url_parser(url)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}"
-    return requests.get(api_url, headers=HEADERS).json()
+    return _repo_info(*url_parser(url))
 
 
 @tool
 def get_repo_languages(url: str) -> dict:
     """Check what programming languages are used in the repo."""
-    owner, repo = url_parser(url)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/languages"
-    return requests.get(api_url, headers=HEADERS).json()
+    return _repo_languages(*url_parser(url))
 
 
 @tool
@@ -56,45 +369,131 @@ def get_repo_commits(url: str) -> list:
     """Get the 10 most recent commits from the repository."""
     owner, repo = url_parser(url)
     api_url = f"https://api.github.com/repos/{owner}/{repo}/commits?per_page=10"
-    return requests.get(api_url, headers=HEADERS).json()
+    return trim_commits(github_get(api_url))
 
 
 @tool
 def get_repo_branches(url: str) -> list:
     """See all the branches in the repository."""
-    owner, repo = url_parser(url)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/branches"
-    return requests.get(api_url, headers=HEADERS).json()
+    return _repo_branches(*url_parser(url))
 
 
 @tool
 def get_repo_contributors(url: str) -> list:
     """Find out who contributes to this repository."""
-    owner, repo = url_parser(url)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contributors"
-    return requests.get(api_url, headers=HEADERS).json()
+    return _repo_contributors(*url_parser(url))
 
 
 @tool
 def list_repo_files(url: str, path: str = "") -> dict:
     """Browse files and folders in the repository."""
     owner, repo = url_parser(url)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-    return requests.get(api_url, headers=HEADERS).json()
+    return _repo_files(owner, repo, path)
 
 
 @tool
-def get_file_content(url: str, file_path: str) -> dict:
-    """Read the actual content of a file in the repository."""
+def get_repo_overview(url: str) -> dict:
+    """Get info, languages, recent commits, branches, contributors and top-level files of a repository in one call."""
     owner, repo = url_parser(url)
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-    response = requests.get(api_url, headers=HEADERS).json()
+    fetchers = {
+        "info": lambda: _repo_info(owner, repo),
+        "languages": lambda: _repo_languages(owner, repo),
+        "recent_commits": lambda: trim_commits(
+            github_get(f"https://api.github.com/repos/{owner}/{repo}/commits?per_page=10")
+        ),
+        "branches": lambda: _repo_branches(owner, repo),
+        "contributors": lambda: _repo_contributors(owner, repo),
+        "files": lambda: _repo_files(owner, repo, ""),
+    }
+
+    # The six endpoints are independent, so the overview costs the slowest one
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+        futures = {name: pool.submit(fetch) for name, fetch in fetchers.items()}
+
+    # One failing endpoint (e.g. contributors on a huge repo) shouldn't sink the rest
+    overview = {}
+    for name, future in futures.items():
+        try:
+            overview[name] = future.result()
+        except httpx.HTTPError as e:
+            overview[name] = {"error": str(e)}
+    return overview
+
+
+def read_file(owner: str, repo: str, file_path: str, size=None) -> dict:
+    """Read one file: raw host first, contents API as fallback."""
+    repo_api = f"https://api.github.com/repos/{owner}/{repo}"
+    branch = _repo_info(owner, repo).get("default_branch", "HEAD")
+
+    # The raw host serves file bytes directly: no base64 inflation or decode pass
+    result = read_raw_file(f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{file_path}", file_path, size)
+    if result is not None:
+        return result
+
+    response = github_get(f"{repo_api}/contents/{file_path}")
 
     if "content" in response:
-        decoded_content = base64.b64decode(response["content"]).decode("utf-8", errors="ignore")
+        data = base64.b64decode(response["content"])
+        if is_binary(data):
+            return binary_placeholder(file_path, len(data))
+        decoded_content = data.decode("utf-8", errors="ignore")
         return {
             "file_path": file_path,
             "content": decoded_content
         }
 
     return response
+
+
+@tool
+def get_file_content(url: str, file_path: str) -> dict:
+    """Read the actual content of a file in the repository."""
+    owner, repo = url_parser(url)
+    return read_file(owner, repo, file_path)
+
+
+@tool
+def get_files_content(url: str, paths: list[str]) -> list:
+    """Read several files from the repository at once. Prefer this over repeated get_file_content calls."""
+    owner, repo = url_parser(url)
+    repo_api = f"https://api.github.com/repos/{owner}/{repo}"
+    branch = _repo_info(owner, repo).get("default_branch", "HEAD")
+
+    # One recursive tree listing resolves every requested path to its blob sha
+    tree = github_get(f"{repo_api}/git/trees/{branch}?recursive=1")
+    blobs = {item["path"]: item for item in tree.get("tree", []) if item["type"] == "blob"}
+    # Very large repos get a partial listing; missing paths may still exist
+    tree_complete = not tree.get("truncated", False)
+
+    def read_blob(file_path):
+        item = blobs.get(file_path)
+        try:
+            if item is None:
+                if tree_complete:
+                    return {"file_path": file_path, "error": "File not found"}
+                return read_file(owner, repo, file_path)
+            if item.get("size", 0) > MAX_FILE_BYTES:
+                # The raw read streams only the first MAX_FILE_BYTES and marks it truncated
+                return read_file(owner, repo, file_path, item["size"])
+
+            blob = github_get(f"{repo_api}/git/blobs/{item['sha']}")
+            data = base64.b64decode(blob["content"])
+            if is_binary(data):
+                return binary_placeholder(file_path, len(data))
+            return {"file_path": file_path, "content": data.decode("utf-8", errors="ignore")}
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            # Keep the rest of the batch when one file fails
+            return {"file_path": file_path, "error": str(e)}
+
+    # Blob fetches are independent, so fan them out over the shared HTTP/2 client
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return list(pool.map(read_blob, paths))
+
+
+@tool
+def refresh_repo_data() -> str:
+    """Discard cached repository data so the next calls fetch fresh results from GitHub."""
+    for cached in SESSION_CACHES:
+        cached.cache_clear()
+    CACHE.expire_all()
+    return "Repository cache cleared"
@@ -1,14 +1,20 @@
-import re
+from functools import lru_cache
 
 
+@lru_cache(maxsize=128)
 def url_parser(url: str) -> tuple[str, str]:
     """Parse a GitHub repo URL and return (owner, repo)."""
-    parts = url
-    parts=parts.rstrip("/")
-    parts=parts.replace(".git","")
-    parts=parts.split("/")
-    owner=parts[-2]
-    repo=parts[-1]
-
-    return owner,repo
-           
\ No newline at end of file
+    # Drop fragment/query, trailing slash and .git, then take the last two segments
+    parts = url.split("#", 1)[0].split("?", 1)[0].rstrip("/")
+    if parts.endswith(".git"):
+        parts = parts[:-4]
+    owner, _, repo = parts.rpartition("/")
+    owner = owner.rpartition("/")[2]
+    if not owner or not repo:
+        raise ValueError(f"Invalid GitHub repository URL: {url}")
+
+    return owner, repo
+
+
+# OPTIONAL: alias to keep compatibility
+parse_github_url = url_parser